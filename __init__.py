@@ -4,7 +4,7 @@ from comfy_api.latest import ComfyExtension, io
 import server
 
 from .nodes import ArtifyXYZPlot, ArtifyXYZViewer
-from .routes import api_get_xyz_images, api_get_xyz_result
+from .routes import api_get_xyz_images, api_get_xyz_result, api_get_xyz_summary
 
 WEB_DIRECTORY = "./web"
 
@@ -24,6 +24,11 @@ def _register_routes() -> None:
     except Exception:
         # Route is already registered (e.g. module reload).
         pass
+    try:
+        prompt_server.routes.get("/artify_testing/xyz/summary")(api_get_xyz_summary)
+    except Exception:
+        # Route is already registered (e.g. module reload).
+        pass
 
 
 _register_routes()
@@ -1,14 +1,14 @@
-import copy
 import functools
 import json
 import os
 import re
 import shutil
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import Any
 
-import numpy as np
 import requests
 import torch
 from PIL import Image
@@ -18,6 +18,18 @@ import folder_paths
 from comfy.cli_args import args
 from comfy_api.latest import io
 
+try:
+    import orjson
+except ImportError:
+    # Optional faster JSON encoder; the stdlib json module is used when it is not installed.
+    orjson = None
+
+try:
+    import simplejpeg
+except ImportError:
+    # Optional libjpeg-turbo encoder; Pillow is used when it is not installed.
+    simplejpeg = None
+
 XYZ_PLOT_DATA = io.Custom("ARTIFY_XYZ_PLOT")
 
 CATEGORY = "Artify/Testing"
@@ -26,8 +38,20 @@ DEFAULT_OUTPUT_FOLDER_TEMPLATE = (
     "%date:yyMMdd%_X_%inputx_node_title%_%inputx_widget_name%_Y_%inputy_node_title%_%inputy_widget_name%_Z_%inputz_node_title%_%inputz_widget_name%"
 )
 DATE_TOKEN_PATTERN = re.compile(r"%date:([^%]+)%")
+# Longer tokens come first so e.g. "yyyy" wins over "yy" at the same position.
+DATE_FORMAT_TOKEN_PATTERN = re.compile(r"yyyy|yy|MM|M|dd|d|HH|H|mm|m|ss|s")
+INVALID_PATH_CHARS_PATTERN = re.compile(r'[<>:"/\\|?*\x00-\x1f]+')
+WHITESPACE_PATTERN = re.compile(r"\s+")
+UNDERSCORE_RUN_PATTERN = re.compile(r"_+")
+SLASH_RUN_PATTERN = re.compile(r"/+")
+SLASH_UNDERSCORE_PATTERN = re.compile(r"_*/_*")
+XYZ_IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "webp"})
+QUEUE_WORKERS = 4
+# Cells submitted but not yet confirmed; keeps memory flat and lets a failed POST stop the sweep early.
+QUEUE_MAX_IN_FLIGHT = QUEUE_WORKERS * 2
 
 
+@functools.cache
 def _server_base_url() -> str:
     base = f"http://{args.listen}:{args.port}"
     if ":" in args.listen:
@@ -38,13 +62,44 @@ def _server_base_url() -> str:
 @functools.cache
 def _http_client() -> requests.Session:
     session = requests.Session()
+    # Only the local ComfyUI server is called; skip proxy/netrc environment lookups per request.
+    session.trust_env = False
     retry = Retry(total=3, backoff_factor=0.1)
-    adapter = HTTPAdapter(max_retries=retry)
+    # Keep one pooled keep-alive connection per concurrent queue worker.
+    adapter = HTTPAdapter(pool_maxsize=QUEUE_WORKERS, max_retries=retry)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
 
+_PIL_FRAMES = threading.local()
+
+
+@functools.cache
+def _encode_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4), thread_name_prefix="artify_xyz_jpeg")
+
+
+def _json_bytes(payload: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(payload, option=option)
+    separators = None if indent else (",", ":")
+    return json.dumps(payload, ensure_ascii=False, indent=2 if indent else None, separators=separators).encode("utf-8")
+
+
+def _join_json_objects(*objects: bytes) -> bytes:
+    # Concatenate the members of already-encoded JSON objects (keys must not overlap).
+    members = [inner for inner in (obj.strip()[1:-1].strip() for obj in objects) if inner]
+    return b"{" + b",".join(members) + b"}"
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def _sanitize_folder_name(name: str) -> str:
     clean = (name or "").strip().replace("\\", "/")
     clean = clean.strip("/")
@@ -58,9 +113,9 @@ def _sanitize_template_component(value: Any) -> str:
     text = str(value or "").strip()
     if not text:
         return ""
-    text = re.sub(r'[<>:"/\\|?*\x00-\x1f]+', "_", text)
-    text = re.sub(r"\s+", "_", text)
-    text = re.sub(r"_+", "_", text).strip("_")
+    text = INVALID_PATH_CHARS_PATTERN.sub("_", text)
+    text = WHITESPACE_PATTERN.sub("_", text)
+    text = UNDERSCORE_RUN_PATTERN.sub("_", text).strip("_")
     return text
 
 
@@ -80,32 +135,15 @@ def _format_custom_date(pattern: str, now: datetime) -> str:
         "ss": f"{now.second:02d}",
         "s": str(now.second),
     }
-    ordered_tokens = sorted(token_values.keys(), key=len, reverse=True)
-
-    out: list[str] = []
-    idx = 0
-    while idx < len(pattern):
-        matched = False
-        for token in ordered_tokens:
-            if pattern.startswith(token, idx):
-                out.append(token_values[token])
-                idx += len(token)
-                matched = True
-                break
-        if matched:
-            continue
-        out.append(pattern[idx])
-        idx += 1
-    return "".join(out)
+    return DATE_FORMAT_TOKEN_PATTERN.sub(lambda match: token_values[match.group(0)], pattern)
 
 
-def _expand_output_folder_template(
-    template: str,
+def _replace_template_tokens(
+    raw: str,
     axis_x: dict[str, str] | None,
     axis_y: dict[str, str] | None,
     axis_z: dict[str, str] | None,
 ) -> str:
-    raw = str(template or "").strip() or DEFAULT_OUTPUT_FOLDER_TEMPLATE
     if axis_z is None:
         # Remove the canonical Z suffix block when Z axis is not used.
         raw = raw.replace("_Z_%inputz_node_title%_%inputz_widget_name%", "")
@@ -138,12 +176,24 @@ def _expand_output_folder_template(
     }
     for token, value in replacements.items():
         out = out.replace(f"%{token}%", value)
+    return out
+
+
+def _expand_output_folder_template(
+    template: str,
+    axis_x: dict[str, str] | None,
+    axis_y: dict[str, str] | None,
+    axis_z: dict[str, str] | None,
+) -> str:
+    raw = str(template or "").strip() or DEFAULT_OUTPUT_FOLDER_TEMPLATE
+    # Plain folder names skip token expansion but still get the same path normalization.
+    out = _replace_template_tokens(raw, axis_x, axis_y, axis_z) if "%" in raw else raw
 
     out = out.replace("\\", "/")
-    out = re.sub(r"\s+", "_", out)
-    out = re.sub(r"_+", "_", out)
-    out = re.sub(r"/+", "/", out)
-    out = re.sub(r"_*/_*", "/", out)
+    out = WHITESPACE_PATTERN.sub("_", out)
+    out = UNDERSCORE_RUN_PATTERN.sub("_", out)
+    out = SLASH_RUN_PATTERN.sub("/", out)
+    out = SLASH_UNDERSCORE_PATTERN.sub("/", out)
     out = out.strip(" _/")
     return _sanitize_folder_name(out)
 
@@ -156,27 +206,24 @@ def _split_values(raw: str) -> list[str]:
         return []
     # Keep semicolon as the primary separator (matches original xyz_plot behavior),
     # but accept comma-separated values when semicolons are not used.
-    if ";" in text:
-        parts = text.split(";")
-    elif "," in text:
-        parts = text.split(",")
-    else:
-        parts = [text]
-    return [v.strip() for v in parts if v.strip()]
+    parts = text.split(";" if ";" in text else ",")
+    return [v for v in map(str.strip, parts) if v]
 
 
-def _output_folder_path(folder_name: str) -> str:
-    return os.path.join(folder_paths.get_output_directory(), folder_name)
+@functools.cache
+def _output_directory() -> str:
+    # The output directory is fixed once ComfyUI has parsed its CLI args.
+    return folder_paths.get_output_directory()
 
 
-def _image_filename(ix: int, iy: int, iz: int, batch_index: int) -> str:
-    if iz >= 0:
-        return f"x{ix}_y{iy}_z{iz}_{batch_index}.jpeg"
-    return f"x{ix}_y{iy}_{batch_index}.jpeg"
+def _output_folder_path(folder_name: str) -> str:
+    return os.path.join(_output_directory(), folder_name)
 
 
-def _preview_src(folder_name: str, filename: str) -> str:
-    return f"/view?filename={filename}&type=output&subfolder={folder_name}"
+def _image_filename_prefix(ix: int, iy: int, iz: int) -> str:
+    if iz >= 0:
+        return f"x{ix}_y{iy}_z{iz}_"
+    return f"x{ix}_y{iy}_"
 
 
 def _parse_input_ref(input_ref: Any) -> dict[str, str] | None:
@@ -202,42 +249,62 @@ def _parse_input_ref(input_ref: Any) -> dict[str, str] | None:
     }
 
 
+def _prompt_node_key(prompt: dict[str, Any], node_id: str) -> Any:
+    key = str(node_id)
+    if prompt.get(key) is not None:
+        return key
+    if key.isdigit() and prompt.get(int(key)) is not None:
+        return int(key)
+    raise ValueError(f"Node id '{node_id}' does not exist in prompt.")
+
+
 def _ensure_prompt_node(prompt: dict[str, Any], node_id: str) -> dict[str, Any]:
-    node = prompt.get(str(node_id))
-    if node is None:
-        node = prompt.get(int(node_id)) if str(node_id).isdigit() else None
-    if node is None:
-        raise ValueError(f"Node id '{node_id}' does not exist in prompt.")
-    return node
+    return prompt[_prompt_node_key(prompt, node_id)]
+
+
+def _copy_prompt_nodes(prompt: dict[str, Any], node_keys: list[Any]) -> dict[str, Any]:
+    # Queued cells only set inputs on a few nodes; copy those nodes and their inputs dicts and
+    # share every other node with the source prompt.
+    new_prompt = dict(prompt)
+    for key in dict.fromkeys(node_keys):
+        node = dict(prompt[key])
+        node["inputs"] = dict(node.get("inputs") or {})
+        new_prompt[key] = node
+    return new_prompt
 
 
-def _set_axis_value(prompt: dict[str, Any], axis_ref: dict[str, str], value: str) -> None:
-    node = _ensure_prompt_node(prompt, axis_ref["node_id"])
-    node_inputs = node.setdefault("inputs", {})
+def _resolve_axis_target(prompt: dict[str, Any], axis_ref: dict[str, str]) -> tuple[Any, str]:
+    node_key = _prompt_node_key(prompt, axis_ref["node_id"])
     widget_name = axis_ref["widget_name"]
-    if widget_name not in node_inputs:
+    if widget_name not in (prompt[node_key].get("inputs") or {}):
         raise ValueError(
             f"Widget '{widget_name}' was not found on node #{axis_ref['node_id']} ({axis_ref.get('node_title', 'unknown')})."
         )
-    node_inputs[widget_name] = value
+    return node_key, widget_name
 
 
 def _queue_prompt(
     prompt_data: dict[str, Any],
     partial_execution_targets: list[str] | None = None,
     client_id: str | None = None,
+    shared_prompt_json: bytes | None = None,
 ) -> None:
-    payload: dict[str, Any] = {"prompt": prompt_data}
+    # shared_prompt_json holds already-encoded nodes that are merged into prompt_data's nodes,
+    # so the payload is spliced as bytes.
+    payload: dict[str, Any] = {}
     if partial_execution_targets:
         payload["partial_execution_targets"] = partial_execution_targets
     if client_id:
         payload["client_id"] = client_id
+    prompt_json = _json_bytes(prompt_data)
+    if shared_prompt_json is not None:
+        prompt_json = _join_json_objects(shared_prompt_json, prompt_json)
 
     response = _http_client().post(
         f"{_server_base_url()}/prompt",
-        json=payload,
+        data=_join_json_objects(b'{"prompt":' + prompt_json + b"}", _json_bytes(payload)),
+        headers={"Content-Type": "application/json"},
         timeout=20,
-        proxies={"http": "", "https": ""},
     )
     if response.status_code != 200:
         raise RuntimeError(f"Queueing XYZ prompt failed ({response.status_code}): {response.text}")
@@ -276,77 +343,98 @@ def _prepare_viewer_refresh_prompt(
     folder_name: str,
     folder_path: str,
 ) -> dict[str, Any]:
-    new_prompt = copy.deepcopy(prompt)
+    viewer_keys = [_prompt_node_key(prompt, viewer_id) for viewer_id in viewer_ids]
+    new_prompt = _copy_prompt_nodes(prompt, viewer_keys)
     plot_data = {
         "folder_name": folder_name,
         "folder_path": folder_path,
         "result_path": os.path.join(folder_path, "result.json"),
     }
 
-    for viewer_id in viewer_ids:
-        viewer_node = _ensure_prompt_node(new_prompt, viewer_id)
-        inputs = viewer_node.setdefault("inputs", {})
+    for viewer_key in viewer_keys:
         # Force viewer to read directly from folder metadata.
-        inputs["xyz_plot"] = plot_data
+        new_prompt[viewer_key]["inputs"]["xyz_plot"] = plot_data
 
     return new_prompt
 
 
-def _save_images(images: torch.Tensor, output_folder: str, ix: int, iy: int, iz: int) -> None:
-    os.makedirs(output_folder, exist_ok=True)
+def _reusable_pil_image(width: int, height: int) -> Image.Image:
+    # Each encoder thread keeps one RGB image and decodes frames into it, since a sweep saves
+    # many frames of the same size.
+    pil_image = getattr(_PIL_FRAMES, "image", None)
+    if pil_image is None or pil_image.size != (width, height):
+        pil_image = Image.new("RGB", (width, height))
+        _PIL_FRAMES.image = pil_image
+    return pil_image
 
-    for batch_index, image_tensor in enumerate(images):
-        arr = (255.0 * image_tensor.cpu().numpy()).clip(0, 255).astype(np.uint8)
-        pil_image = Image.fromarray(arr).convert("RGB")
-        filename = _image_filename(ix, iy, iz, batch_index)
-        pil_image.save(os.path.join(output_folder, filename), "JPEG", quality=90)
 
+@functools.lru_cache(maxsize=1)
+def _pinned_frame_buffer(shape: tuple[int, ...]) -> torch.Tensor:
+    # Every cell of a sweep saves a batch of the same shape, so one buffer is enough.
+    return torch.empty(shape, dtype=torch.uint8, pin_memory=True)
 
-def _build_result_tree(
-    folder_name: str,
-    values_x: list[str],
-    values_y: list[str],
-    values_z: list[str],
-    batch_size: int,
-) -> list[dict[str, Any]]:
-    result = []
-    has_z = len(values_z) > 0
-
-    for ix, vx in enumerate(values_x):
-        row = []
-        for iy, vy in enumerate(values_y):
-            cell = []
-            if has_z:
-                for iz, vz in enumerate(values_z):
-                    z_imgs = []
-                    for batch_index in range(batch_size):
-                        filename = _image_filename(ix, iy, iz, batch_index)
-                        z_imgs.append(
-                            {
-                                "uuid": f"{folder_name}:{ix}:{iy}:{iz}:{batch_index}",
-                                "type": "img",
-                                "filename": filename,
-                                "src": _preview_src(folder_name, filename),
-                            }
-                        )
-                    cell.append({"type": "axis", "value": vz, "children": z_imgs})
-            else:
-                for batch_index in range(batch_size):
-                    filename = _image_filename(ix, iy, -1, batch_index)
-                    cell.append(
-                        {
-                            "uuid": f"{folder_name}:{ix}:{iy}:-1:{batch_index}",
-                            "type": "img",
-                            "filename": filename,
-                            "src": _preview_src(folder_name, filename),
-                        }
-                    )
 
-            row.append({"type": "axis", "value": vy, "children": cell})
+def _write_file_bytes(path: str, data: bytes) -> None:
+    # Encoded images are written in one go, so skip the buffered file object entirely.
+    # O_BINARY (Windows only) keeps the bytes from being newline-translated.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
 
-        result.append({"type": "axis", "value": vx, "children": row})
+def _write_jpeg(path: str, frame: Any) -> None:
+    if simplejpeg is not None:
+        # 4:2:0 matches Pillow's default; simplejpeg would otherwise write larger, slower 4:4:4 files.
+        data = simplejpeg.encode_jpeg(frame, quality=90, colorspace="RGB", fastdct=True, colorsubsampling="420")
+        _write_file_bytes(path, data)
+        return
 
-    return result
+    pil_image = _reusable_pil_image(frame.shape[1], frame.shape[0])
+    pil_image.frombytes(frame)
+    pil_image.save(path, "JPEG", quality=90)
+
+
+def _save_images(images: torch.Tensor, output_folder: str, ix: int, iy: int, iz: int) -> None:
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Scale/clamp/cast the whole batch on its own device so only uint8 data is copied to host.
+    frames = images.detach().mul(255.0).clamp_(0.0, 255.0).to(torch.uint8)
+    # Encoders take RGB frames directly; drop alpha or widen grayscale once for the whole batch.
+    if frames.shape[-1] > 3:
+        frames = frames[..., :3]
+    elif frames.shape[-1] < 3:
+        frames = frames[..., :1].expand(*frames.shape[:-1], 3)
+    frames = frames.contiguous()
+    if frames.is_cuda:
+        # Reuse one pinned host buffer across the sweep instead of a pageable copy per cell.
+        host_frames = _pinned_frame_buffer(tuple(frames.shape))
+        host_frames.copy_(frames, non_blocking=True)
+        torch.cuda.current_stream(frames.device).synchronize()
+        frames = host_frames
+    frames = frames.cpu().numpy()
+    # The cell (and z mode) is fixed for the call, so only the batch index varies per path.
+    prefix = os.path.join(output_folder, _image_filename_prefix(ix, iy, iz))
+    paths = [f"{prefix}{batch_index}.jpeg" for batch_index in range(len(frames))]
+
+    if len(frames) == 1:
+        _write_jpeg(paths[0], frames[0])
+        return
+
+    # The JPEG encoder releases the GIL, so batch frames can be encoded in parallel.
+    list(_encode_pool().map(_write_jpeg, paths, frames))
+
+
+def _build_result_grid(has_z: bool) -> dict[str, str]:
+    # result.json v2 stores the grid as a filename rule over values.x/y/z and batch_size instead
+    # of one dict per image; the viewer expands it on load. Must match _save_images.
+    return {
+        "type": "grid",
+        "filename_format": "x{x}_y{y}_z{z}_{batch}.jpeg" if has_z else "x{x}_y{y}_{batch}.jpeg",
+    }
 
 
 def _build_annotations(input_x: dict[str, str], input_y: dict[str, str], input_z: dict[str, str] | None) -> list[dict[str, str]]:
@@ -369,15 +457,15 @@ def _read_result_json(folder_path: str) -> dict[str, Any] | None:
     result_path = os.path.join(folder_path, "result.json")
     if not os.path.exists(result_path):
         return None
-    with open(result_path, "r", encoding="utf-8") as file:
-        return json.load(file)
+    with open(result_path, "rb") as file:
+        return _json_loads(file.read())
 
 
 def _write_result_json(folder_path: str, payload: dict[str, Any]) -> None:
     os.makedirs(folder_path, exist_ok=True)
     result_path = os.path.join(folder_path, "result.json")
-    with open(result_path, "w", encoding="utf-8") as file:
-        json.dump(payload, file, ensure_ascii=False, indent=2)
+    with open(result_path, "wb") as file:
+        file.write(_json_bytes(payload, indent=True))
 
 
 def _collect_plot_meta(folder_path: str) -> dict[str, Any]:
@@ -390,7 +478,10 @@ def _collect_plot_meta(folder_path: str) -> dict[str, Any]:
     values_y = list(result_json.get("values", {}).get("y", []))
     values_z = list(result_json.get("values", {}).get("z", []))
 
-    if not values_x or not values_y:
+    if isinstance(result_tree, dict):
+        # v2 grid descriptor: the axis values and batch size are stored directly.
+        batch_size = max(1, int(result_json.get("batch_size") or 1))
+    elif not values_x or not values_y:
         values_x, values_y, values_z, batch_size = _extract_axis_values_from_tree(result_tree)
     else:
         _, _, _, batch_size = _extract_axis_values_from_tree(result_tree)
@@ -431,21 +522,49 @@ def _extract_axis_values_from_tree(result_tree: list[dict[str, Any]]) -> tuple[l
     return values_x, values_y, values_z, batch_size
 
 
+def _parse_image_filename(name: str) -> tuple[int, int, int, int] | None:
+    # Parses x{ix}_y{iy}[_z{iz}]_{batch}.{jpg|jpeg|png|webp} (case-insensitive) without a regex.
+    base, dot, ext = name.lower().rpartition(".")
+    if not dot or ext not in XYZ_IMAGE_EXTENSIONS:
+        return None
+
+    parts = base.split("_")
+    if len(parts) == 3:
+        x_part, y_part, batch_part = parts
+        z_part = "z-1"
+    elif len(parts) == 4:
+        x_part, y_part, z_part, batch_part = parts
+        if not z_part.startswith("z") or not z_part[1:].isdecimal():
+            return None
+    else:
+        return None
+
+    if not x_part.startswith("x") or not x_part[1:].isdecimal():
+        return None
+    if not y_part.startswith("y") or not y_part[1:].isdecimal():
+        return None
+    if not batch_part.isdecimal():
+        return None
+    return int(x_part[1:]), int(y_part[1:]), int(z_part[1:]), int(batch_part)
+
+
 def _infer_plot_meta_from_filenames(folder_path: str) -> dict[str, Any]:
-    pattern = re.compile(r"^x(\d+)_y(\d+)(?:_z(\d+))?_(\d+)\.(?:jpg|jpeg|png|webp)$", re.IGNORECASE)
     x_indices: set[int] = set()
     y_indices: set[int] = set()
     z_indices: set[int] = set()
     batches: set[int] = set()
 
-    for name in os.listdir(folder_path):
-        match = pattern.match(name)
-        if not match:
-            continue
-        x_indices.add(int(match.group(1)))
-        y_indices.add(int(match.group(2)))
-        z_indices.add(int(match.group(3)) if match.group(3) is not None else -1)
-        batches.add(int(match.group(4)))
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            parsed = _parse_image_filename(entry.name)
+            # Name check first: scandir usually knows the entry type, so is_file() rarely stats.
+            if parsed is None or not entry.is_file():
+                continue
+            ix, iy, iz, batch_index = parsed
+            x_indices.add(ix)
+            y_indices.add(iy)
+            z_indices.add(iz)
+            batches.add(batch_index)
 
     if not x_indices or not y_indices:
         raise ValueError(f"No XYZ images found in folder: {folder_path}")
@@ -587,16 +706,8 @@ class ArtifyXYZPlot(io.ComfyNode):
 
         batch_size = int(images.shape[0]) if hasattr(images, "shape") and len(images.shape) > 0 else len(images)
 
-        result_tree = _build_result_tree(
-            folder_name=folder_name,
-            values_x=values_x,
-            values_y=values_y,
-            values_z=effective_values_z,
-            batch_size=batch_size,
-        )
-
         payload = {
-            "format": "artify_xyz_plot_v1",
+            "format": "artify_xyz_plot_v2",
             "folder_name": folder_name,
             "created_at": int(time.time()),
             "values": {
@@ -606,14 +717,14 @@ class ArtifyXYZPlot(io.ComfyNode):
             },
             "batch_size": batch_size,
             "annotations": _build_annotations(axis_x, axis_y, axis_z if effective_values_z else None),
-            "result": result_tree,
+            "result": _build_result_grid(has_z=len(effective_values_z) > 0),
         }
 
         if cls.hidden and cls.hidden.extra_pnginfo and "workflow" in cls.hidden.extra_pnginfo:
             os.makedirs(output_folder, exist_ok=True)
             workflow_path = os.path.join(output_folder, "workflow.json")
-            with open(workflow_path, "w", encoding="utf-8") as file:
-                json.dump(cls.hidden.extra_pnginfo["workflow"], file, ensure_ascii=False, indent=2)
+            with open(workflow_path, "wb") as file:
+                file.write(_json_bytes(cls.hidden.extra_pnginfo["workflow"], indent=True))
             payload["workflow"] = {"filename": "workflow.json"}
 
         _write_result_json(output_folder, payload)
@@ -633,51 +744,64 @@ class ArtifyXYZPlot(io.ComfyNode):
         client_id = _current_client_id()
         viewer_node_ids = _find_viewer_node_ids(prompt, unique_id)
 
-        queued = 0
         has_z = len(effective_values_z) > 0
-
-        for ix, vx in enumerate(values_x):
-            for iy, vy in enumerate(values_y):
-                if has_z:
-                    for iz, vz in enumerate(effective_values_z):
-                        new_prompt = copy.deepcopy(prompt)
-                        _set_axis_value(new_prompt, axis_x, vx)
-                        _set_axis_value(new_prompt, axis_y, vy)
-                        _set_axis_value(new_prompt, axis_z, vz)
-
-                        xyz_payload = {
+        # Resolve the plot node and axis widgets once; each cell then only assigns input values.
+        plot_key = _prompt_node_key(prompt, unique_id)
+        axis_targets = [_resolve_axis_target(prompt, axis_x), _resolve_axis_target(prompt, axis_y)]
+        if has_z:
+            axis_targets.append(_resolve_axis_target(prompt, axis_z))
+        mutated_keys = list(dict.fromkeys([plot_key, *(node_key for node_key, _ in axis_targets)]))
+        mutated_nodes = {key: prompt[key] for key in mutated_keys}
+        # Every other node is identical across cells, so it is encoded once and spliced into each body.
+        shared_nodes_json = _json_bytes({key: node for key, node in prompt.items() if key not in mutated_nodes})
+        z_cells = list(enumerate(effective_values_z)) if has_z else [(-1, None)]
+
+        # Cells are independent, so their POSTs overlap on a small pool; the server still runs
+        # them one at a time. The viewer refresh below is only queued once every cell is queued.
+        in_flight: set[Future] = set()
+        queued = 0
+        queue_pool = ThreadPoolExecutor(max_workers=QUEUE_WORKERS, thread_name_prefix="artify_xyz_queue")
+        try:
+            for ix, vx in enumerate(values_x):
+                for iy, vy in enumerate(values_y):
+                    for iz, vz in z_cells:
+                        cell_nodes = _copy_prompt_nodes(mutated_nodes, mutated_keys)
+                        for (node_key, widget_name), value in zip(axis_targets, (vx, vy, vz)):
+                            cell_nodes[node_key]["inputs"][widget_name] = value
+
+                        cell_nodes[plot_key]["inputs"]["xyz_data"] = {
                             "source_unique_id": unique_id,
                             "output_folder_name": folder_name,
                             "x_index": ix,
                             "y_index": iy,
                             "z_index": iz,
                         }
-                        _ensure_prompt_node(new_prompt, unique_id).setdefault("inputs", {})["xyz_data"] = xyz_payload
-                        _queue_prompt(
-                            new_prompt,
-                            partial_execution_targets=[unique_id],
-                            client_id=client_id,
+                        # Collect finished POSTs (blocking only when the window is full) and
+                        # raise on the first failure before submitting anything else.
+                        done, in_flight = wait(
+                            in_flight,
+                            timeout=None if len(in_flight) >= QUEUE_MAX_IN_FLIGHT else 0,
+                            return_when=FIRST_COMPLETED,
                         )
-                        queued += 1
-                else:
-                    new_prompt = copy.deepcopy(prompt)
-                    _set_axis_value(new_prompt, axis_x, vx)
-                    _set_axis_value(new_prompt, axis_y, vy)
-
-                    xyz_payload = {
-                        "source_unique_id": unique_id,
-                        "output_folder_name": folder_name,
-                        "x_index": ix,
-                        "y_index": iy,
-                        "z_index": -1,
-                    }
-                    _ensure_prompt_node(new_prompt, unique_id).setdefault("inputs", {})["xyz_data"] = xyz_payload
-                    _queue_prompt(
-                        new_prompt,
-                        partial_execution_targets=[unique_id],
-                        client_id=client_id,
-                    )
-                    queued += 1
+                        for future in done:
+                            future.result()
+                        queued += len(done)
+                        in_flight.add(
+                            queue_pool.submit(
+                                _queue_prompt,
+                                cell_nodes,
+                                partial_execution_targets=[unique_id],
+                                client_id=client_id,
+                                shared_prompt_json=shared_nodes_json,
+                            )
+                        )
+
+            for future in in_flight:
+                future.result()
+            queued += len(in_flight)
+        finally:
+            # If a cell failed to queue, drop the submitted cells that have not started posting.
+            queue_pool.shutdown(cancel_futures=True)
 
         # After all cell-generation prompts are queued, schedule a final viewer
         # refresh prompt that reads directly from the output folder.
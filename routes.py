@@ -1,17 +1,217 @@
+import asyncio
 import os
-import json
+import re
+import time
+from collections import OrderedDict
+from stat import S_ISDIR
 from aiohttp import web
 
-import folder_paths
+from .nodes import _json_bytes, _json_loads, _output_directory
 
-IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".avif"}
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".avif"})
+
+BACKSLASH_TO_SLASH = str.maketrans("\\", "/")
+# Control characters anywhere, or a "." / ".." path segment.
+INVALID_FOLDER_NAME_PATTERN = re.compile(r"[\x00-\x1f\x7f]|(?:^|/)\.{1,2}(?:/|$)")
+
+# Blocking file work runs in worker threads; this caps how many requests do so at once.
+IO_SEMAPHORE = asyncio.BoundedSemaphore(16)
+
+# Response bodies for recently served result.json files, keyed by (folder_name, mtime_ns, size).
+RESULT_CACHE_SIZE = 128
+_result_cache: OrderedDict[tuple[str, int, int], bytes] = OrderedDict()
+# In-flight reads, so concurrent polls for the same file share a single read.
+_result_reads: dict[tuple[str, int, int], asyncio.Future] = {}
+
+# Image listing bodies keyed by (folder_name, directory mtime_ns); adding or removing a file
+# changes the directory mtime.
+LISTING_CACHE_SIZE = 256
+_listing_cache: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+# Directory mtimes can be coarse (a few ms on ext4, seconds elsewhere), so a file written in the
+# same tick as a scan would not invalidate it. Listings are only cached once the folder has settled.
+LISTING_SETTLE_NS = 2_000_000_000
+
+# Names handed from the scanning thread to a ?stream=1 response per event-loop wakeup.
+STREAM_BATCH_SIZE = 256
 
 
 def _sanitize_folder_name(name: str) -> str:
-    value = (name or "").strip().replace("\\", "/")
-    value = value.strip("/")
-    value = value.replace("..", "")
-    return value
+    return (name or "").strip().translate(BACKSLASH_TO_SLASH).strip("/")
+
+
+def _resolve_folder_path(folder_name: str) -> str | None:
+    # Returns None for names that are malformed or would resolve outside the output directory
+    # (e.g. drive-qualified names on Windows), before anything touches the filesystem.
+    if INVALID_FOLDER_NAME_PATTERN.search(folder_name):
+        return None
+    output_directory = os.path.abspath(_output_directory())
+    folder_path = os.path.abspath(os.path.join(output_directory, folder_name))
+    try:
+        if os.path.commonpath([output_directory, folder_path]) != output_directory:
+            return None
+    except ValueError:
+        # Different drives on Windows.
+        return None
+    return folder_path
+
+
+def _json_body_response(body: bytes) -> web.Response:
+    # Folder contents change while a sweep runs, so clients must always revalidate.
+    return web.Response(body=body, content_type="application/json", headers={"Cache-Control": "no-cache"})
+
+
+def _stat_etag(stat: os.stat_result) -> str:
+    # Weak validator: any rewrite changes the size or the modification time.
+    return f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+def _with_validators(response: web.Response, etag: str, stat: os.stat_result) -> web.Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    response.last_modified = stat.st_mtime
+    return response
+
+
+def _read_result_body(path: str, folder_name: str) -> bytes:
+    with open(path, "rb") as file:
+        payload = _json_loads(file.read())
+    if not isinstance(payload, dict):
+        raise ValueError("result.json does not contain a JSON object")
+    payload["folder_name"] = folder_name
+    return _json_bytes(payload)
+
+
+def _has_image_extension(name: str) -> bool:
+    dot = name.rfind(".")
+    return dot > 0 and name[dot:].lower() in IMAGE_EXTENSIONS
+
+
+def _iter_images(folder_path: str):
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            name = entry.name
+            if _has_image_extension(name) and entry.is_file():
+                yield name
+
+
+def _list_images(folder_path: str) -> list[str]:
+    files = list(_iter_images(folder_path))
+    files.sort(key=str.lower)
+    return files
+
+
+def _read_summary_body(folder_path: str, folder_name: str) -> bytes:
+    # One scandir pass finds both the images and result.json. An unreadable or invalid
+    # result.json is reported as null so the file list is still usable.
+    files = []
+    result_path = None
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            name = entry.name
+            if _has_image_extension(name):
+                if entry.is_file():
+                    files.append(name)
+            elif name == "result.json" and entry.is_file():
+                result_path = entry.path
+    files.sort(key=str.lower)
+
+    result = None
+    if result_path is not None:
+        try:
+            with open(result_path, "rb") as file:
+                result = _json_loads(file.read())
+        except (OSError, ValueError):
+            result = None
+        if not isinstance(result, dict):
+            result = None
+    return _json_bytes({"folder_name": folder_name, "result": result, "files": files})
+
+
+async def _stream_images(request, folder_path: str) -> web.StreamResponse:
+    # NDJSON: one {"file": name} line per image in directory order (unsorted), written while the
+    # scan is still running. A scan error after the headers are sent becomes an {"error": ...} line.
+    loop = asyncio.get_running_loop()
+    batches: asyncio.Queue = asyncio.Queue()
+
+    def scan() -> None:
+        batch = []
+        try:
+            for name in _iter_images(folder_path):
+                batch.append(name)
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    loop.call_soon_threadsafe(batches.put_nowait, batch)
+                    batch = []
+        except OSError as error:
+            loop.call_soon_threadsafe(batches.put_nowait, batch)
+            loop.call_soon_threadsafe(batches.put_nowait, error)
+        else:
+            loop.call_soon_threadsafe(batches.put_nowait, batch)
+        finally:
+            loop.call_soon_threadsafe(batches.put_nowait, None)
+
+    async def run_scan() -> None:
+        async with IO_SEMAPHORE:
+            await asyncio.to_thread(scan)
+
+    scan_task = asyncio.ensure_future(run_scan())
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    while (batch := await batches.get()) is not None:
+        if isinstance(batch, OSError):
+            await response.write(_json_bytes({"error": f"failed to list folder: {batch}"}) + b"\n")
+        elif batch:
+            await response.write(b"".join(_json_bytes({"file": name}) + b"\n" for name in batch))
+    await scan_task
+    await response.write_eof()
+    return response
+
+
+async def _read_result_body_limited(path: str, folder_name: str) -> bytes:
+    async with IO_SEMAPHORE:
+        return await asyncio.to_thread(_read_result_body, path, folder_name)
+
+
+async def _cached_result_body(path: str, folder_name: str, stat: os.stat_result) -> bytes:
+    key = (folder_name, stat.st_mtime_ns, stat.st_size)
+    body = _result_cache.get(key)
+    if body is not None:
+        _result_cache.move_to_end(key)
+        return body
+
+    read = _result_reads.get(key)
+    if read is None:
+        read = asyncio.ensure_future(_read_result_body_limited(path, folder_name))
+        _result_reads[key] = read
+        read.add_done_callback(lambda _: _result_reads.pop(key, None))
+    # Shielded so one client disconnecting does not cancel the read other requests are waiting on.
+    body = await asyncio.shield(read)
+
+    _result_cache[key] = body
+    while len(_result_cache) > RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+    return body
+
+
+async def _listing_body(folder_path: str, folder_name: str, stat: os.stat_result, cacheable: bool) -> bytes:
+    key = (folder_name, stat.st_mtime_ns)
+    body = _listing_cache.get(key) if cacheable else None
+    if body is not None:
+        _listing_cache.move_to_end(key)
+        return body
+
+    async with IO_SEMAPHORE:
+        files = await asyncio.to_thread(_list_images, folder_path)
+    body = _json_bytes({"folder_name": folder_name, "files": files})
+    if cacheable:
+        _listing_cache[key] = body
+        while len(_listing_cache) > LISTING_CACHE_SIZE:
+            _listing_cache.popitem(last=False)
+    return body
 
 
 async def api_get_xyz_result(request):
@@ -19,20 +219,41 @@ async def api_get_xyz_result(request):
     if not folder_name:
         return web.json_response({"error": "folder_name is required"}, status=400)
 
-    folder_path = os.path.join(folder_paths.get_output_directory(), folder_name)
+    folder_path = _resolve_folder_path(folder_name)
+    if folder_path is None:
+        return web.json_response({"error": "invalid folder_name"}, status=400)
     result_path = os.path.join(folder_path, "result.json")
 
-    if not os.path.exists(result_path):
-        return web.json_response({"error": f"result.json not found for folder '{folder_name}'"}, status=404)
-
     try:
-        with open(result_path, "r", encoding="utf-8") as file:
-            payload = json.load(file)
+        async with IO_SEMAPHORE:
+            stat = await asyncio.to_thread(os.stat, result_path)
+        etag = _stat_etag(stat)
+        if _etag_matches(request, etag):
+            return _with_validators(web.Response(status=304), etag, stat)
+        body = await _cached_result_body(result_path, folder_name, stat)
+    except (FileNotFoundError, NotADirectoryError):
+        return web.json_response({"error": f"result.json not found for folder '{folder_name}'"}, status=404)
     except Exception as error:
         return web.json_response({"error": f"failed to read result.json: {error}"}, status=500)
 
-    payload["folder_name"] = folder_name
-    return web.json_response(payload)
+    return _with_validators(_json_body_response(body), etag, stat)
+
+
+async def api_get_xyz_summary(request):
+    folder_name = _sanitize_folder_name(request.query.get("folder_name", ""))
+    if not folder_name:
+        return web.json_response({"error": "folder_name is required"}, status=400)
+
+    folder_path = _resolve_folder_path(folder_name)
+    if folder_path is None:
+        return web.json_response({"error": "invalid folder_name"}, status=400)
+    try:
+        async with IO_SEMAPHORE:
+            body = await asyncio.to_thread(_read_summary_body, folder_path, folder_name)
+    except (FileNotFoundError, NotADirectoryError):
+        return web.json_response({"error": f"folder not found: '{folder_name}'"}, status=404)
+
+    return _json_body_response(body)
 
 
 async def api_get_xyz_images(request):
@@ -40,17 +261,23 @@ async def api_get_xyz_images(request):
     if not folder_name:
         return web.json_response({"error": "folder_name is required"}, status=400)
 
-    folder_path = os.path.join(folder_paths.get_output_directory(), folder_name)
-    if not os.path.isdir(folder_path):
+    folder_path = _resolve_folder_path(folder_name)
+    if folder_path is None:
+        return web.json_response({"error": "invalid folder_name"}, status=400)
+    try:
+        async with IO_SEMAPHORE:
+            stat = await asyncio.to_thread(os.stat, folder_path)
+        if not S_ISDIR(stat.st_mode):
+            raise NotADirectoryError(folder_path)
+        if request.query.get("stream") == "1":
+            return await _stream_images(request, folder_path)
+        settled = time.time_ns() - stat.st_mtime_ns > LISTING_SETTLE_NS
+        etag = _stat_etag(stat)
+        if settled and _etag_matches(request, etag):
+            return _with_validators(web.Response(status=304), etag, stat)
+        body = await _listing_body(folder_path, folder_name, stat, cacheable=settled)
+    except (FileNotFoundError, NotADirectoryError):
         return web.json_response({"error": f"folder not found: '{folder_name}'"}, status=404)
 
-    files = []
-    for entry in os.scandir(folder_path):
-        if not entry.is_file():
-            continue
-        if os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
-            continue
-        files.append(entry.name)
-
-    files.sort(key=lambda value: value.lower())
-    return web.json_response({"folder_name": folder_name, "files": files})
+    response = _json_body_response(body)
+    return _with_validators(response, etag, stat) if settled else response
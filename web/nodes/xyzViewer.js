@@ -1117,14 +1117,56 @@ function applyFlatImages(node, images, folderLabel) {
   node.setDirtyCanvas(true, true);
 }
 
+function formatGridFilename(format, ix, iy, iz, batchIndex) {
+  return format
+    .replace("{x}", String(ix))
+    .replace("{y}", String(iy))
+    .replace("{z}", String(iz))
+    .replace("{batch}", String(batchIndex));
+}
+
+// result.json v2 stores a grid descriptor instead of the nested image tree; expand it into the
+// v1 tree shape the renderers use. Images only carry a filename and resolve against the folder.
+function normalizeResultData(json) {
+  if (!json || typeof json !== "object") return null;
+  if (Array.isArray(json.result)) return json;
+  if (json.result?.type !== "grid") return null;
+
+  const format = String(json.result.filename_format || "");
+  const valuesX = Array.isArray(json.values?.x) ? json.values.x : [];
+  const valuesY = Array.isArray(json.values?.y) ? json.values.y : [];
+  const valuesZ = Array.isArray(json.values?.z) ? json.values.z : [];
+  const batchSize = Math.max(1, Number(json.batch_size) || 1);
+  if (!format || valuesX.length < 1 || valuesY.length < 1) return null;
+
+  const buildImages = (ix, iy, iz) =>
+    Array.from({ length: batchSize }, (_, batchIndex) => ({
+      type: "img",
+      filename: formatGridFilename(format, ix, iy, iz, batchIndex),
+    }));
+  const buildCell = (ix, iy) =>
+    valuesZ.length > 0
+      ? valuesZ.map((vz, iz) => ({ type: "axis", value: vz, children: buildImages(ix, iy, iz) }))
+      : buildImages(ix, iy, -1);
+
+  return {
+    ...json,
+    result: valuesX.map((vx, ix) => ({
+      type: "axis",
+      value: vx,
+      children: valuesY.map((vy, iy) => ({ type: "axis", value: vy, children: buildCell(ix, iy) })),
+    })),
+  };
+}
+
 async function parseResultJsonFromFiles(files) {
   const resultFile = (files || []).find((file) => String(file?.name || "").toLowerCase() === "result.json");
   if (!resultFile) return null;
 
   try {
     const text = await resultFile.text();
-    const json = JSON.parse(text);
-    if (json && typeof json === "object" && Array.isArray(json.result)) return json;
+    const json = normalizeResultData(JSON.parse(text));
+    if (json) return json;
   } catch {
     // Ignore invalid result.json.
   }
@@ -1172,8 +1214,8 @@ async function loadServerFolder(node, folderName) {
   try {
     const resultResponse = await api.fetchApi(`/artify_testing/xyz/result?folder_name=${encodeURIComponent(folder)}`);
     if (resultResponse.ok) {
-      const payload = await resultResponse.json();
-      if (Array.isArray(payload?.result)) {
+      const payload = normalizeResultData(await resultResponse.json());
+      if (payload) {
         applyResultData(node, payload, folder);
         return true;
       }